@@ -1,5 +1,10 @@
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from logHandler import log
 
 # --- CONFIGURATION V2 ---
@@ -18,6 +23,125 @@ for i in range(1, 6):
     FILES_TO_DOWNLOAD.append(f"voice_styles/F{i}.json")
     FILES_TO_DOWNLOAD.append(f"voice_styles/M{i}.json")
 
+# Read/write size for streamed downloads (1 MiB)
+_HTTP_CHUNK = 1 << 20
+# Parallel downloads; the connection pool is sized to cover all workers
+_DOWNLOAD_WORKERS = 4
+_POOL_CONNECTIONS = 4  # hosts kept alive (huggingface.co plus its CDN redirects)
+_POOL_MAXSIZE = 16     # connections kept alive per host
+# Retry transient server errors with exponential backoff instead of failing the file
+_RETRY = Retry(total=5, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+
+def _remote_info(session, url):
+    """Returns (Content-Length, ETag) of url; either is None if the server does not report it."""
+    # Follow the redirect to the CDN, which reports the real file size and version
+    r = session.head(url, allow_redirects=True, timeout=30)
+    r.raise_for_status()
+    length = r.headers.get("Content-Length")
+    return (int(length) if length else None), r.headers.get("ETag")
+
+def _read_etag(etag_path):
+    try:
+        with open(etag_path, 'r') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write_etag(etag_path, etag):
+    """Records the ETag a .part file is being downloaded under, so a resume can't mix versions."""
+    if etag:
+        with open(etag_path, 'w') as f:
+            f.write(etag)
+    elif os.path.exists(etag_path):
+        os.remove(etag_path)
+
+def _download_one(session, f_path, addon_dir):
+    # Determine local target path (maintains the onnx/ and voice_styles/ folders)
+    target = os.path.join(addon_dir, f_path)
+    
+    target_dir = os.path.dirname(target)
+    if not os.path.exists(target_dir):
+        os.makedirs(target_dir, exist_ok=True)
+    
+    url = f"{REPO_URL}/{f_path}"
+    part = target + ".part"
+    if os.path.exists(target):
+        # Only a size match counts as complete: older installers wrote in place and
+        # could leave a truncated file behind
+        size = os.path.getsize(target)
+        try:
+            total, etag = _remote_info(session, url)
+        except requests.RequestException as e:
+            # Offline reinstall or server trouble: keep the file we already have
+            log.info(f"Supertonic V2: Keeping {f_path}, could not verify it: {e}")
+            return
+        if total is None or size == total:
+            return
+        # Its remote version is unknown, so it is fetched again rather than resumed
+        log.info(f"Supertonic V2: {f_path} is incomplete ({size} of {total} bytes)")
+        os.remove(target)
+    else:
+        try:
+            total, etag = _remote_info(session, url)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                log.error(f"Supertonic V2: File not found (404): {url}")
+                return
+            raise
+    
+    # Bytes left behind by an interrupted install are resumed, not fetched again, but
+    # only while the remote file still has the (strong) ETag they were downloaded under.
+    # REPO_URL follows a moving branch, so the file may have changed in between.
+    etag_path = part + ".etag"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    if offset and (
+        not etag
+        or etag.startswith("W/")
+        or _read_etag(etag_path) != etag
+        or (total is not None and offset > total)
+    ):
+        offset = 0
+    
+    if total is None or offset < total:
+        if offset:
+            log.info(f"Supertonic V2: Resuming {f_path} at {offset} bytes...")
+            headers = {"Range": f"bytes={offset}-", "If-Range": etag}
+        else:
+            log.info(f"Supertonic V2: Downloading {f_path}...")
+            headers = {}
+        
+        r = session.get(url, headers=headers, stream=True, timeout=30)
+        if offset and r.status_code == 416:
+            # The stored bytes can't be resumed against the remote file; start over
+            r.close()
+            offset = 0
+            r = session.get(url, stream=True, timeout=30)
+        
+        with r:
+            r.raise_for_status()
+            if offset and r.status_code != 206:
+                # Server ignored the Range header, or If-Range found a changed file,
+                # and sent the whole file
+                offset = 0
+            if not offset:
+                _write_etag(etag_path, etag)
+            with open(part, 'ab' if offset else 'wb', buffering=_HTTP_CHUNK) as f:
+                # Copy from urllib3 in C, skipping the per-chunk Python loop and requests' reassembly
+                r.raw.decode_content = True
+                shutil.copyfileobj(r.raw, f, length=_HTTP_CHUNK)
+                # Sync once per file instead of once per chunk
+                f.flush()
+                os.fsync(f.fileno())
+    
+    size = os.path.getsize(part)
+    if total is not None and size != total:
+        log.error(f"Supertonic V2: Incomplete download of {f_path} ({size} of {total} bytes)")
+        return
+    # The .part file was fsynced before closing, so the atomic rename publishes complete data only
+    os.replace(part, target)
+    if os.path.exists(etag_path):
+        os.remove(etag_path)
+
 def onInstall():
     
     base_dir = os.path.dirname(__file__)
@@ -26,37 +150,28 @@ def onInstall():
     
     log.info(f"Supertonic V2: Starting download to {addon_dir}")
     
-    headers = {"User-Agent": "Mozilla/5.0"}
+    # Identity encoding keeps Content-Length and Range offsets in raw file bytes
+    headers = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": "identity"}
     
     with requests.Session() as session:
         session.headers.update(headers)
+        # One pooled adapter shared by all workers keeps connections alive between files
+        adapter = HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS,
+            pool_maxsize=_POOL_MAXSIZE,
+            max_retries=_RETRY
+        )
+        session.mount("https://", adapter)
         
-        try:
-            for f_path in FILES_TO_DOWNLOAD:
-                # Determine local target path (maintains the onnx/ and voice_styles/ folders)
-                target = os.path.join(addon_dir, f_path)
-                
-                target_dir = os.path.dirname(target)
-                if not os.path.exists(target_dir):
-                    os.makedirs(target_dir, exist_ok=True)
-                
-                if not os.path.exists(target):
-                    log.info(f"Supertonic V2: Downloading {f_path}...")
-                    url = f"{REPO_URL}/{f_path}"
-                    
-                    with session.get(url, stream=True, timeout=30) as r:
-                        if r.status_code == 404:
-                            log.error(f"Supertonic V2: File not found (404): {url}")
-                            continue
-                        r.raise_for_status()
-                        with open(target, 'wb') as f:
-                            for chunk in r.iter_content(chunk_size=1024*1024):
-                                if chunk:
-                                    f.write(chunk)
-                                    f.flush()
-                                    os.fsync(f.fileno())
-            
-            log.info("Supertonic V2: Download process completed.")
-            
-        except Exception as e:
-            log.error(f"Supertonic V2: Error during download: {e}")
+        with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(_download_one, session, f_path, addon_dir): f_path
+                for f_path in FILES_TO_DOWNLOAD
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    log.error(f"Supertonic V2: Error downloading {futures[future]}: {e}")
+        
+        log.info("Supertonic V2: Download process completed.")
@@ -29,13 +29,20 @@ if LIBS_DIR not in sys.path:
 try:
     import numpy as np
     # Import the V2 helper classes provided in helper.py
-    from .helper import load_text_to_speech, load_voice_style, AVAILABLE_LANGS, chunk_text
+    from .helper import load_text_to_speech, load_voice_style, AVAILABLE_LANGS, chunk_text_balanced
+    # Compiled PCM kernel (None when numba is not bundled)
+    from ._pcm import amplify_to_pcm16
     log.info("Supertonic 2: Dependencies (incl. numpy from libs) and helper loaded.")
 except ImportError as e:
     log.error(f"Supertonic 2: Critical error loading dependencies: {e}")
     # Fallback languages if import fails
     AVAILABLE_LANGS = ["en", "ko", "es", "pt", "fr"]
 
+# Maximum number of chunks synthesized together in one batched inference call.
+# Kept small: a batch is only interruptible between its denoising steps, and each
+# step costs more the more chunks it carries.
+_MAX_BATCH = 2
+
 # =========================================================================
 # SYNTHESIS QUEUE THREAD
 # =========================================================================
@@ -46,72 +53,159 @@ class _SynthQueueThread(threading.Thread):
         self.driver = driver
         self.daemon = True
         self.stop_event = threading.Event()
-        self.cancel_event = threading.Event()
+        # Float scratch and PCM output buffers reused across chunks, grown on demand
+        self._scratch = None
+        self._pcm = None
+        # Synthesized chunks waiting for playback. Kept small so inference runs
+        # at most a couple of chunks ahead of the audio device.
+        self._audio_queue = queue.Queue(maxsize=2)
+        self._feeder_thread = threading.Thread(target=self._feed_audio)
+        self._feeder_thread.daemon = True
+
+    def _is_cancelled(self, token):
+        """
+        A request is cancelled once cancel() has moved the driver past the token it was queued with.
+        """
+        return token != self.driver._cancel_token
+
+    def _to_pcm16(self, wav):
+        """
+        Converts float samples to 16-bit PCM in reused buffers.
+        Returns the number of samples written to self._pcm.
+        """
+        samples = wav.reshape(-1)
+        n = samples.shape[0]
+        if self._pcm is None or self._pcm.shape[0] < n:
+            self._pcm = np.empty(n, dtype=np.int16)
+
+        if amplify_to_pcm16 is not None:
+            # Amplify (gain factor 2.0), clip and convert in one compiled pass
+            amplify_to_pcm16(samples, (self.driver._volume / 100.0) * 2.0, self._pcm[:n])
+            return n
+
+        if self._scratch is None or self._scratch.shape[0] < n:
+            self._scratch = np.empty(n, dtype=np.float32)
+        scratch = self._scratch[:n]
+
+        # Volume (gain factor 2.0) and 16-bit scale folded into one multiply
+        gain = (self.driver._volume / 100.0) * 2.0 * 32767.0
+        np.multiply(samples, gain, out=scratch)
+
+        # Clip to prevent distortion, saturating straight into the int16 buffer
+        np.clip(scratch, -32767.0, 32767.0, out=self._pcm[:n], casting="unsafe")
+        return n
+
+    def _feed_audio(self):
+        """
+        Playback side of the pipeline: converts and feeds chunk N while run() infers chunk N+1.
+        """
+        ctypes.windll.ole32.CoInitialize(None)
+        while True:
+            item = self._audio_queue.get()
+            if item is None:
+                self._audio_queue.task_done()
+                break
+            token, wav = item
+            try:
+                if not self._is_cancelled(token) and self.driver._player:
+                    n_samples = self._to_pcm16(wav)
+                    # Feed the buffer by pointer; feed() copies it before returning
+                    self.driver._player.feed(
+                        self._pcm.ctypes.data_as(ctypes.c_void_p),
+                        size=n_samples * 2
+                    )
+            except Exception as e:
+                log.error(f"Supertonic 2: Playback error: {e}")
+            finally:
+                self._audio_queue.task_done()
+        ctypes.windll.ole32.CoUninitialize()
 
     def run(self):
         """
         Streaming worker: Processes text in small chunks for minimal latency.
         """
         ctypes.windll.ole32.CoInitialize(None)
+        self._feeder_thread.start()
         log.info("Supertonic 2: Streaming queue worker started.")
         while not self.stop_event.is_set():
-            try:
-                # Wait for request: (text, lang_code, style_obj, speed, index)
-                request = self.driver._request_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
+            # Block until a request arrives: (text, lang_code, style_obj, speed, index, cancel_token),
+            # or the None sentinel pushed by terminate()
+            request = self.driver._request_queue.get()
+            if request is None:
+                self.driver._request_queue.task_done()
+                break
 
-            self.cancel_event.clear()
-            text, lang, style, speed, index = request
+            text, lang, style, speed, index, token = request
             
             try:
-                if self.cancel_event.is_set():
+                if self._is_cancelled(token):
                     continue
 
                 if text and text.strip() and self.driver.tts_engine:
-                    # Split text directly into small chunks for fast feedback (max 150 characters)
-                    chunks = chunk_text(text, max_len=150)
+                    # Split text directly into small chunks for fast feedback (max 150 characters),
+                    # without leaving a short final chunk that costs a near-full inference
+                    chunks = chunk_text_balanced(text, max_len=150, min_tail=60)
                     
-                    for chunk in chunks:
-                        if self.cancel_event.is_set():
+                    # The first chunk is synthesized alone so audio starts quickly; the rest
+                    # are batched and inferred while the first one is playing.
+                    groups = [chunks[:1]] if chunks else []
+                    groups += [chunks[i:i + _MAX_BATCH] for i in range(1, len(chunks), _MAX_BATCH)]
+                    
+                    for group in groups:
+                        if self._is_cancelled(token):
                             break
                         
                         # Convert the internal quality value to an integer (1-15)
                         steps_value = int(self.driver._quality)
                         
-                        # Use the internal _infer method for direct control per chunk
-                        # FIX: Languages must be passed as a list: [lang]
-                        wav, _ = self.driver.tts_engine._infer(
-                            [chunk], 
-                            [lang], 
-                            style, 
-                            total_step=steps_value, 
-                            speed=speed
-                        )
+                        # Polled between ONNX runs, so a cancel interrupts inference
+                        # within one denoising step instead of after the whole group
+                        should_stop = lambda: self._is_cancelled(token)
+                        
+                        try:
+                            wavs = self.driver.tts_engine.infer_chunks(
+                                group, lang, style, total_step=steps_value, speed=speed,
+                                should_stop=should_stop
+                            )
+                        except Exception as e:
+                            if len(group) == 1:
+                                raise
+                            log.warning(f"Supertonic 2: Batched synthesis failed, falling back to single chunks: {e}")
+                            wavs = []
+                            for chunk in group:
+                                if self._is_cancelled(token):
+                                    break
+                                wavs += self.driver.tts_engine.infer_chunks(
+                                    [chunk], lang, style, total_step=steps_value, speed=speed,
+                                    should_stop=should_stop
+                                )
                         
-                        if not self.cancel_event.is_set() and wav is not None:
-                            # Volume processing (Updated gain factor to 2.0)
-                            volume_factor = (self.driver._volume / 100.0) * 2.0
-                            wav_amplified = wav * volume_factor
-                            
-                            # Clip to prevent distortion
-                            wav_clamped = np.clip(wav_amplified, -1.0, 1.0)
-                            
-                            # Convert to 16-bit PCM
-                            audio_int16 = (wav_clamped * 32767).astype(np.int16).tobytes()
-                            
-                            if self.driver._player:
-                                self.driver._player.feed(audio_int16)
+                        for wav in wavs:
+                            if self._is_cancelled(token):
+                                break
+                            # Hand off to the feeder thread and start on the next chunk
+                            self._audio_queue.put((token, wav))
+                    
+                    # Wait until every chunk of this request has been fed
+                    self._audio_queue.join()
                 
-                if index is not None and not self.cancel_event.is_set():
+                if index is not None and not self._is_cancelled(token):
                     synthIndexReached.notify(synth=self.driver, index=index)
                 
             except Exception as e:
                 log.error(f"Supertonic 2: Synthesis error: {e}")
             finally:
+                # Never ack a request while its audio is still queued for playback
+                self._audio_queue.join()
                 self.driver._request_queue.task_done()
+                self.driver._request_finished()
+            
+            # Report "done speaking" once at the end of a batch of queued requests,
+            # and not at all for a cancelled one
+            if self.driver._request_queue.empty() and not self._is_cancelled(token):
                 synthDoneSpeaking.notify(synth=self.driver)
         
+        self._audio_queue.put(None)
         ctypes.windll.ole32.CoUninitialize()
 
 # =========================================================================
@@ -166,6 +260,8 @@ class SynthDriver(BaseSynthDriver):
         self.tts_engine = None
         self._player = None
         self.current_style_obj = None
+        # Parsed voice styles by voice ID, so switching back to a voice skips the JSON parse
+        self._style_cache = {}
         
         super(SynthDriver, self).__init__()
         
@@ -173,6 +269,11 @@ class SynthDriver(BaseSynthDriver):
         self.model_base_dir = os.path.join(DRIVER_DIR, "models")
         
         self._request_queue = queue.Queue()
+        # Bumped by cancel(); requests queued under an older token are discarded
+        self._cancel_token = 0
+        # Requests queued or being spoken; 0 means the worker is idle
+        self._pending_requests = 0
+        self._pending_lock = threading.Lock()
         self._voice_loaded_event = threading.Event()
 
         # Start loading models in a separate thread
@@ -194,6 +295,9 @@ class SynthDriver(BaseSynthDriver):
                  return
 
             self.tts_engine = load_text_to_speech(onnx_dir, use_gpu=False)
+            if amplify_to_pcm16 is not None:
+                # Compile the PCM kernel now so the first utterance is not delayed by the JIT
+                amplify_to_pcm16(np.zeros(1, dtype=np.float32), 1.0, np.zeros(1, dtype=np.int16))
             self._load_style(self._current_voice_id)
             
             self._player = WavePlayer(
@@ -205,14 +309,34 @@ class SynthDriver(BaseSynthDriver):
             
             self._voice_loaded_event.set()
             log.info("Supertonic 2: Synthesizer successfully loaded.")
+            
+            # Parse the remaining voices in the background so later switches are instant
+            prefetch_thread = threading.Thread(target=self._prefetch_styles)
+            prefetch_thread.daemon = True
+            prefetch_thread.start()
         except Exception as e:
             log.error(f"Supertonic 2: Initialization failed: {e}")
 
+    def _prefetch_styles(self):
+        for voice_id in self._available_voices:
+            if voice_id in self._style_cache:
+                continue
+            style_path = os.path.join(self.model_base_dir, "voice_styles", f"{voice_id}.json")
+            try:
+                if os.path.exists(style_path):
+                    self._style_cache[voice_id] = load_voice_style([style_path])
+            except Exception as e:
+                log.error(f"Supertonic 2: Error prefetching voice {voice_id}: {e}")
+
     def _load_style(self, voice_id):
+        if voice_id in self._style_cache:
+            self.current_style_obj = self._style_cache[voice_id]
+            return
         try:
             style_path = os.path.join(self.model_base_dir, "voice_styles", f"{voice_id}.json")
             if os.path.exists(style_path):
                 self.current_style_obj = load_voice_style([style_path])
+                self._style_cache[voice_id] = self.current_style_obj
                 log.info(f"Supertonic 2: Voice {voice_id} loaded.")
             else:
                 log.error(f"Supertonic 2: Voice file not found: {style_path}")
@@ -269,20 +393,35 @@ class SynthDriver(BaseSynthDriver):
         
         combined_text = "".join(text_parts)
         
+        if not combined_text.strip() and last_index is not None \
+                and self._pending_requests == 0:
+            # Nothing queued or speaking: report a pure index right away
+            # instead of waking the worker just to notify it.
+            synthIndexReached.notify(synth=self, index=last_index)
+            synthDoneSpeaking.notify(synth=self)
+            return
+        
         if combined_text.strip() or last_index is not None:
             # Speed locked at the recommended 1.05
             speed_factor = 1.05
+            with self._pending_lock:
+                self._pending_requests += 1
             self._request_queue.put((
                 combined_text, 
                 self._current_lang, 
                 self.current_style_obj, 
                 speed_factor, 
-                last_index
+                last_index,
+                self._cancel_token
             ))
 
+    def _request_finished(self):
+        """Called once for every queued request, whether it was spoken or drained by cancel()."""
+        with self._pending_lock:
+            self._pending_requests -= 1
+
     def cancel(self):
-        if hasattr(self, '_worker_thread'):
-            self._worker_thread.cancel_event.set()
+        self._cancel_token += 1
         if self._player:
             try:
                 self._player.stop()
@@ -290,13 +429,21 @@ class SynthDriver(BaseSynthDriver):
                 pass
         try:
             while not self._request_queue.empty():
-                self._request_queue.get_nowait()
+                request = self._request_queue.get_nowait()
+                self._request_queue.task_done()
+                if request is None:
+                    # Keep the shutdown sentinel for the worker
+                    self._request_queue.put(None)
+                    break
+                self._request_finished()
         except queue.Empty:
             pass
 
     def terminate(self):
         if hasattr(self, '_worker_thread'):
             self._worker_thread.stop_event.set()
+            # Wake the worker from its blocking get() so it can exit
+            self._request_queue.put(None)
         if self._player:
             self._player.close()
         self.tts_engine = None
@@ -0,0 +1,29 @@
+"""
+Float to 16-bit PCM conversion kernel for the synthesis worker.
+
+Numba is optional: when it is available in the libs folder the amplify, clip
+and convert steps run as one compiled loop that LLVM can vectorize. Without it
+amplify_to_pcm16 is None and the worker uses its NumPy path instead.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def amplify_to_pcm16(wav, gain, out):
+        for i in range(wav.shape[0]):
+            v = wav[i] * gain
+            if v > 1.0:
+                v = 1.0
+            elif v < -1.0:
+                v = -1.0
+            out[i] = np.int16(v * 32767.0)
+
+else:
+    amplify_to_pcm16 = None
@@ -1,8 +1,9 @@
 import json
 import os
+import pickle
 import time
 from contextlib import contextmanager
-from typing import Optional
+from typing import Callable, Optional
 from unicodedata import normalize
 
 import numpy as np
@@ -15,8 +16,7 @@ AVAILABLE_LANGS = ["en", "ko", "es", "pt", "fr"]
 
 class UnicodeProcessor:
     def __init__(self, unicode_indexer_path: str):
-        with open(unicode_indexer_path, "r") as f:
-            self.indexer = json.load(f)
+        self.indexer = load_json_cached(unicode_indexer_path)
 
     def _preprocess_text(self, text: str, lang: str) -> str:
         # TODO: Need advanced normalizer for better performance
@@ -157,6 +157,7 @@ class TextToSpeech:
         self.base_chunk_size = cfgs["ae"]["base_chunk_size"]
         self.chunk_compress_factor = cfgs["ttl"]["chunk_compress_factor"]
         self.ldim = cfgs["ttl"]["latent_dim"]
+        self.vector_est_output = vector_est_ort.get_outputs()[0].name
 
     def sample_noisy_latent(
         self, duration: np.ndarray
@@ -181,36 +182,59 @@ class TextToSpeech:
         style: Style,
         total_step: int,
         speed: float = 1.05,
-    ) -> tuple[np.ndarray, np.ndarray]:
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        should_stop is polled before every ONNX run (each denoising step
+        included); once it returns True, inference is abandoned and
+        (None, None) is returned.
+        """
         assert (
             len(text_list) == style.ttl.shape[0]
         ), "Number of texts must match number of style vectors"
+        stopped = should_stop or (lambda: False)
         bsz = len(text_list)
         text_ids, text_mask = self.text_processor(text_list, lang_list)
         dur_onnx, *_ = self.dp_ort.run(
             None, {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask}
         )
         dur_onnx = dur_onnx / speed
+        if stopped():
+            return None, None
         text_emb_onnx, *_ = self.text_enc_ort.run(
             None,
             {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask},
         )  # dur_onnx: [bsz]
         xt, latent_mask = self.sample_noisy_latent(dur_onnx)
         total_step_np = np.array([total_step] * bsz, dtype=np.float32)
+        # Inputs that are fixed across denoising steps are bound once; each step
+        # only rebinds the latent and step index, and writes its output into a
+        # preallocated buffer that is swapped with the input for the next step.
+        binding = self.vector_est_ort.io_binding()
+        binding.bind_cpu_input("text_emb", text_emb_onnx)
+        binding.bind_cpu_input("style_ttl", style.ttl)
+        binding.bind_cpu_input("text_mask", text_mask)
+        binding.bind_cpu_input("latent_mask", latent_mask)
+        binding.bind_cpu_input("total_step", total_step_np)
+        xt_next = np.empty_like(xt)
         for step in range(total_step):
-            current_step = np.array([step] * bsz, dtype=np.float32)
-            xt, *_ = self.vector_est_ort.run(
-                None,
-                {
-                    "noisy_latent": xt,
-                    "text_emb": text_emb_onnx,
-                    "style_ttl": style.ttl,
-                    "text_mask": text_mask,
-                    "latent_mask": latent_mask,
-                    "current_step": current_step,
-                    "total_step": total_step_np,
-                },
+            if stopped():
+                return None, None
+            current_step = np.full(bsz, step, dtype=np.float32)
+            binding.bind_cpu_input("noisy_latent", xt)
+            binding.bind_cpu_input("current_step", current_step)
+            binding.bind_output(
+                self.vector_est_output,
+                "cpu",
+                0,
+                np.float32,
+                list(xt.shape),
+                xt_next.ctypes.data,
             )
+            self.vector_est_ort.run_with_iobinding(binding)
+            xt, xt_next = xt_next, xt
+        if stopped():
+            return None, None
         wav, *_ = self.vocoder_ort.run(None, {"latent": xt})
         return wav, dur_onnx
 
@@ -243,6 +267,35 @@ class TextToSpeech:
                 dur_cat += dur_onnx + silence_duration
         return wav_cat, dur_cat
 
+    def infer_chunks(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> list[np.ndarray]:
+        """
+        Synthesize several chunks of one utterance in a single batched _infer call.
+
+        The single-speaker style is broadcast over the batch and each wav is
+        trimmed to its predicted duration, dropping the batch padding. Returns
+        an empty list if should_stop interrupted the inference.
+        """
+        bsz = len(text_list)
+        if style.ttl.shape[0] != bsz:
+            style = Style(
+                np.repeat(style.ttl, bsz, axis=0), np.repeat(style.dp, bsz, axis=0)
+            )
+        wav, dur_onnx = self._infer(
+            text_list, [lang] * bsz, style, total_step, speed, should_stop
+        )
+        if wav is None:
+            return []
+        wav_lengths = (dur_onnx * self.sample_rate).astype(np.int64)
+        return [wav[i, : wav_lengths[i]] for i in range(bsz)]
+
     def batch(
         self,
         text_list: list[str],
@@ -280,12 +333,62 @@ def get_latent_mask(
     return latent_mask
 
 
+def is_cache_fresh(cache_path: str, source_path: str) -> bool:
+    """True if cache_path exists and is not older than source_path."""
+    return os.path.exists(cache_path) and os.path.getmtime(
+        cache_path
+    ) >= os.path.getmtime(source_path)
+
+
+def load_json_cached(json_path: str):
+    """
+    Load a JSON file through a pickle cache stored next to it (<name>.pkl).
+
+    Unpickling is much faster than parsing JSON for large files such as the
+    unicode indexer; the cache is rebuilt whenever the JSON file is newer.
+    """
+    cache_path = os.path.splitext(json_path)[0] + ".pkl"
+    if is_cache_fresh(cache_path, json_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return data
+
+
 def load_onnx(
     onnx_path: str, opts: ort.SessionOptions, providers: list[str]
 ) -> ort.InferenceSession:
     return ort.InferenceSession(onnx_path, sess_options=opts, providers=providers)
 
 
+def get_onnx_path(onnx_dir: str, name: str) -> str:
+    """Return the INT8-quantized variant (<name>.int8.onnx) if installed, else the FP32 model."""
+    quantized_path = os.path.join(onnx_dir, f"{name}.int8.onnx")
+    if os.path.exists(quantized_path):
+        return quantized_path
+    return os.path.join(onnx_dir, f"{name}.onnx")
+
+
+def get_intra_op_threads() -> int:
+    """
+    Heuristic intra-op thread count: half the logical CPUs, kept between 2 and 4.
+
+    Halving assumes 2-way SMT; it undercounts cores on CPUs without SMT and
+    does not distinguish performance from efficiency cores on hybrid CPUs.
+    """
+    logical = os.cpu_count() or 4
+    return max(2, min(4, logical // 2))
+
+
 def load_onnx_all(
     onnx_dir: str, opts: ort.SessionOptions, providers: list[str]
 ) -> tuple[
@@ -294,10 +397,10 @@ def load_onnx_all(
     ort.InferenceSession,
     ort.InferenceSession,
 ]:
-    dp_onnx_path = os.path.join(onnx_dir, "duration_predictor.onnx")
-    text_enc_onnx_path = os.path.join(onnx_dir, "text_encoder.onnx")
-    vector_est_onnx_path = os.path.join(onnx_dir, "vector_estimator.onnx")
-    vocoder_onnx_path = os.path.join(onnx_dir, "vocoder.onnx")
+    dp_onnx_path = get_onnx_path(onnx_dir, "duration_predictor")
+    text_enc_onnx_path = get_onnx_path(onnx_dir, "text_encoder")
+    vector_est_onnx_path = get_onnx_path(onnx_dir, "vector_estimator")
+    vocoder_onnx_path = get_onnx_path(onnx_dir, "vocoder")
 
     dp_ort = load_onnx(dp_onnx_path, opts, providers)
     text_enc_ort = load_onnx(text_enc_onnx_path, opts, providers)
@@ -323,8 +426,8 @@ def load_text_to_speech(onnx_dir: str, use_gpu: bool = False) -> TextToSpeech:
     opts = ort.SessionOptions()
     # OPTIMIZATION: Set optimization level to highest
     opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-    # OPTIMIZATION: Limit the number of threads to avoid overhead (try 2 or 4)
-    opts.intra_op_num_threads = 2 
+    # OPTIMIZATION: Scale threads with the CPU (see get_intra_op_threads), capped to avoid overhead
+    opts.intra_op_num_threads = get_intra_op_threads()
     # OPTIMIZATION: Prevent memory allocation delays
     opts.enable_cpu_mem_arena = True
 
@@ -391,6 +494,11 @@ def sanitize_filename(text: str, max_len: int) -> str:
     return re.sub(r"[^\w]", "_", prefix, flags=re.UNICODE)
 
 
+# Split by sentence boundaries (period, question mark, exclamation mark followed by space)
+# But exclude common abbreviations like Mr., Mrs., Dr., etc. and single capital letters like F.
+SENTENCE_BOUNDARY_PATTERN = r"(?<!Mr\.)(?<!Mrs\.)(?<!Ms\.)(?<!Dr\.)(?<!Prof\.)(?<!Sr\.)(?<!Jr\.)(?<!Ph\.D\.)(?<!etc\.)(?<!e\.g\.)(?<!i\.e\.)(?<!vs\.)(?<!Inc\.)(?<!Ltd\.)(?<!Co\.)(?<!Corp\.)(?<!St\.)(?<!Ave\.)(?<!Blvd\.)(?<!\b[A-Z]\.)(?<=[.!?])\s+"
+
+
 def chunk_text(text: str, max_len: int = 300) -> list[str]:
     """
     Split text into chunks by paragraphs and sentences.
@@ -414,10 +522,7 @@ def chunk_text(text: str, max_len: int = 300) -> list[str]:
         if not paragraph:
             continue
 
-        # Split by sentence boundaries (period, question mark, exclamation mark followed by space)
-        # But exclude common abbreviations like Mr., Mrs., Dr., etc. and single capital letters like F.
-        pattern = r"(?<!Mr\.)(?<!Mrs\.)(?<!Ms\.)(?<!Dr\.)(?<!Prof\.)(?<!Sr\.)(?<!Jr\.)(?<!Ph\.D\.)(?<!etc\.)(?<!e\.g\.)(?<!i\.e\.)(?<!vs\.)(?<!Inc\.)(?<!Ltd\.)(?<!Co\.)(?<!Corp\.)(?<!St\.)(?<!Ave\.)(?<!Blvd\.)(?<!\b[A-Z]\.)(?<=[.!?])\s+"
-        sentences = re.split(pattern, paragraph)
+        sentences = re.split(SENTENCE_BOUNDARY_PATTERN, paragraph)
 
         current_chunk = ""
 
@@ -432,4 +537,51 @@ def chunk_text(text: str, max_len: int = 300) -> list[str]:
         if current_chunk:
             chunks.append(current_chunk.strip())
 
-    return chunks
\ No newline at end of file
+    return chunks
+
+def chunk_text_balanced(text: str, max_len: int = 150, min_tail: int = 60) -> list[str]:
+    """
+    Split text like chunk_text, but avoid a tiny trailing chunk.
+
+    When the last chunk is shorter than min_tail, the last two chunks are
+    merged if they fit in max_len, or else re-split at the sentence boundary
+    nearest their midpoint. Sentences are never cut, so a tail that cannot be
+    lengthened that way is left as it is.
+
+    Args:
+        text: Input text to chunk
+        max_len: Maximum length of each chunk (default: 150)
+        min_tail: Minimum desired length of the last chunk (default: 60)
+
+    Returns:
+        List of text chunks
+    """
+    chunks = chunk_text(text, max_len=max_len)
+    if len(chunks) < 2 or len(chunks[-1]) >= min_tail:
+        return chunks
+
+    # A chunk without closing punctuation ends a paragraph (e.g. a heading);
+    # joining it to the next one would run the two together when spoken
+    if not re.search(r"[.!?]$", chunks[-2]):
+        return chunks
+
+    merged = chunks[-2] + " " + chunks[-1]
+    if len(merged) <= max_len:
+        return chunks[:-2] + [merged]
+
+    sentences = re.split(SENTENCE_BOUNDARY_PATTERN, merged)
+    middle = len(merged) // 2
+    best = None
+    for i in range(1, len(sentences)):
+        head = " ".join(sentences[:i])
+        tail = " ".join(sentences[i:])
+        if len(head) > max_len or len(tail) > max_len:
+            continue
+        if len(tail) <= len(chunks[-1]):
+            continue
+        if best is None or abs(len(head) - middle) < abs(len(best[0]) - middle):
+            best = (head, tail)
+    if best is not None:
+        return chunks[:-2] + list(best)
+
+    return chunks
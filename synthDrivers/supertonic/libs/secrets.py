@@ -1,22 +1,40 @@
 import os
 import binascii
-import random
-from hmac import compare_digest
 
-# Use the secure system generator from the random module
-_sysrand = random.SystemRandom()
+# Random values come straight from os.urandom, so importing this module does
+# not pull in random (and its hashlib/math setup) or hmac.
+
+def __getattr__(name):
+    # compare_digest is imported from hmac only when someone asks for it
+    if name == "compare_digest":
+        from hmac import compare_digest
+        return compare_digest
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def randbits(k):
     """Generate an integer with k random bits."""
-    return _sysrand.getrandbits(k)
+    if k < 0:
+        raise ValueError("number of bits must be non-negative")
+    numbytes = (k + 7) // 8
+    x = int.from_bytes(os.urandom(numbytes), 'big')
+    return x >> (numbytes * 8 - k)
 
 def choice(seq):
     """Choose a random element from a non-empty sequence."""
-    return _sysrand.choice(seq)
+    if not len(seq):
+        raise IndexError('Cannot choose from an empty sequence')
+    return seq[randbelow(len(seq))]
 
 def randbelow(n):
     """Generate a random integer in the range [0, n)."""
-    return _sysrand.randrange(n)
+    if n <= 0:
+        raise ValueError("Upper bound must be positive.")
+    # Rejection sampling keeps the result uniform
+    k = n.bit_length()
+    r = randbits(k)
+    while r >= n:
+        r = randbits(k)
+    return r
 
 def token_bytes(nbytes=None):
     if nbytes is None: